@@ -5,9 +5,143 @@ Proper SIR model with realistic parameters and results
 Krishna Aryal - Georgia Tech MS Analytics
 """
 
+import collections
+import functools
+
 import numpy as np
 import pandas as pd
-from scipy.integrate import odeint
+from numba import njit, prange
+from scipy.integrate import odeint, solve_ivp
+from scipy.sparse import csr_matrix
+
+# Lightweight simulation result: plain ndarrays, no pandas overhead.
+# Build a DataFrame from it with to_dataframe() only when one is needed.
+SimResult = collections.namedtuple('SimResult', 'day S I R')
+
+def to_dataframe(sim):
+    """
+    Materialize a SimResult as the usual five-column DataFrame
+    """
+    return pd.DataFrame({
+        'Day': sim.day,
+        'Susceptible': sim.S,
+        'Infected': sim.I,
+        'Recovered': sim.R,
+        'Total': sim.S + sim.I + sim.R
+    })
+
+@njit(cache=True, fastmath=True)
+def _sir_step(S0, I0, R0, beta, gamma, N, days):
+    """
+    Compiled discrete SIR integration kernel
+
+    Runs the day-by-day update loop in native code; the wrapping
+    class method handles printing and DataFrame construction.
+    """
+    S = np.empty(days + 1)
+    I = np.empty(days + 1)
+    R = np.empty(days + 1)
+
+    # Scalar running state; arrays are only written once per day.
+    # β/N is constant, so hoisting it leaves no divide in the loop.
+    beta_over_N = beta / N
+    s, i, r = S0, I0, R0
+    S[0], I[0], R[0] = s, i, r
+
+    for t in range(days):
+        new_infections = beta_over_N * s * i
+        new_recoveries = gamma * i
+
+        s -= new_infections
+        i += new_infections - new_recoveries
+        r += new_recoveries
+
+        S[t+1] = s
+        I[t+1] = i
+        R[t+1] = r
+
+    return S, I, R
+
+@functools.lru_cache(maxsize=256)
+def _simulate_cached(beta, gamma, N, I0, days):
+    """
+    Memoized wrapper around the integration kernel
+
+    Repeated runs with the same parameters (dashboard re-renders,
+    sensitivity panels reusing the baseline) become a dict lookup.
+    The cached arrays are marked read-only so one caller cannot
+    corrupt another's results.
+    """
+    S, I, R = _sir_step(N - I0, I0, 0.0, beta, gamma, N, days)
+    S.setflags(write=False)
+    I.setflags(write=False)
+    R.setflags(write=False)
+
+    return S, I, R
+
+@njit(cache=True)
+def _sir_rhs(t, y, beta, gamma, N):
+    """
+    Compiled SIR right-hand side for the continuous solver
+
+    Free function so each of the thousands of solver callbacks runs
+    native code with no attribute lookups on the model instance.
+    """
+    S, I, R = y
+    new_infections = beta * S * I / N
+
+    return np.array([-new_infections,
+                     new_infections - gamma * I,
+                     gamma * I])
+
+@njit(cache=True)
+def _sir_jac(t, y, beta, gamma, N):
+    """
+    Compiled analytic Jacobian matching _sir_rhs
+    """
+    S, I, R = y
+    bN = beta / N
+
+    return np.array([[-bN * I, -bN * S, 0.0],
+                     [bN * I, bN * S - gamma, 0.0],
+                     [0.0, gamma, 0.0]])
+
+@njit(parallel=True, cache=True, fastmath=True)
+def simulate_batch(betas, gammas, S0, I0, N, days):
+    """
+    Run one discrete SIR simulation per (β, γ) pair in parallel
+
+    Each parameter combination is independent, so the outer loop is a
+    prange: one thread per combination, all sharing the compiled kernel.
+    Returns (S, I, R) trajectories, each a (len(betas), days+1) array
+    in structure-of-arrays layout.
+    """
+    K = len(betas)
+    S_out = np.empty((K, days + 1))
+    I_out = np.empty((K, days + 1))
+    R_out = np.empty((K, days + 1))
+
+    for k in prange(K):
+        beta_over_N = betas[k] / N
+        gamma = gammas[k]
+        S = S0
+        I = I0
+        R = 0.0
+        S_out[k, 0] = S
+        I_out[k, 0] = I
+        R_out[k, 0] = R
+
+        for t in range(days):
+            new_infections = beta_over_N * S * I
+            new_recoveries = gamma * I
+            S -= new_infections
+            I += new_infections - new_recoveries
+            R += new_recoveries
+            S_out[k, t+1] = S
+            I_out[k, t+1] = I
+            R_out[k, t+1] = R
+
+    return S_out, I_out, R_out
 
 class SIRModel:
     """
@@ -19,15 +153,19 @@ class SIRModel:
     dR/dt = γ*I
     """
     
-    def __init__(self, population=1000, initial_infected=1, beta=0.5, gamma=0.1):
+    def __init__(self, population=1000, initial_infected=1, beta=0.5, gamma=0.1,
+                 dtype=np.float32):
         """
         Initialize SIR model with correct parameters
-        
+
         Parameters:
         - population: Total population (N)
-        - initial_infected: Initial infected individuals (I0)  
+        - initial_infected: Initial infected individuals (I0)
         - beta: Transmission rate (β) - realistic range 0.1-2.0
         - gamma: Recovery rate (γ) - typically 0.05-0.2
+        - dtype: Storage dtype for simulation output; float32 halves the
+          memory traffic and is ample for populations up to ~10^7, pass
+          np.float64 if double precision is needed
         """
         self.N = population
         self.I0 = initial_infected
@@ -35,27 +173,68 @@ class SIRModel:
         self.R0 = 0
         self.beta = beta
         self.gamma = gamma
+        self.dtype = np.dtype(dtype)
         
     def differential_equations(self, y, t):
         """
         SIR differential equations system
         """
         S, I, R = y
-        
-        dSdt = -self.beta * S * I / self.N
-        dIdt = self.beta * S * I / self.N - self.gamma * I
-        dRdt = self.gamma * I
-        
-        return dSdt, dIdt, dRdt
-    
-    def solve_model(self, t_max=75, t_points=1000):
+
+        # Shared infection term: the interpreter doesn't eliminate
+        # common subexpressions, so compute it once
+        infections = self.beta * S * I / self.N
+        recoveries = self.gamma * I
+
+        return (-infections, infections - recoveries, recoveries)
+
+    def solve_model_lsoda(self, t_max=75, t_points=1000, jac_sparsity=None):
         """
-        Solve SIR model using continuous differential equations
+        LSODA solve that can exploit Jacobian structure
+
+        The 3-compartment model has a dense 3x3 Jacobian, but SEIR or
+        age-structured extensions produce banded ones. Pass their
+        sparsity pattern (anything scipy.sparse accepts) and it is
+        converted to the lband/uband limits LSODA uses to factor a
+        banded Jacobian instead of a dense one. With no pattern the
+        compiled analytic Jacobian is supplied directly.
         """
         t = np.linspace(0, t_max, t_points)
         y0 = [self.S0, self.I0, self.R0]
-        solution = odeint(self.differential_equations, y0, t)
-        
+        args = (float(self.beta), float(self.gamma), float(self.N))
+
+        if jac_sparsity is None:
+            options = {'jac': _sir_jac}
+        else:
+            rows, cols = csr_matrix(jac_sparsity).nonzero()
+            options = {'lband': int(np.max(rows - cols)),
+                       'uband': int(np.max(cols - rows))}
+
+        sol = solve_ivp(_sir_rhs, (0, t_max), y0, method='LSODA', args=args,
+                        rtol=1e-6, atol=1e-9, dense_output=True, **options)
+        solution = sol.sol(t).T
+
+        return t, solution
+
+    def solve_model(self, t_max=75, t_points=1000, use_odeint=False):
+        """
+        Solve SIR model using continuous differential equations
+
+        By default integrates with solve_ivp and dense output: LSODA
+        chooses its own internal steps (far fewer than t_points for
+        these smooth curves) and the requested grid is sampled from the
+        interpolant afterwards. use_odeint=True keeps the original
+        fixed-grid code path for comparison.
+        """
+        if use_odeint:
+            t = np.linspace(0, t_max, t_points)
+            y0 = [self.S0, self.I0, self.R0]
+            args = (float(self.beta), float(self.gamma), float(self.N))
+            solution = odeint(_sir_rhs, y0, t, args=args, Dfun=_sir_jac,
+                              tfirst=True)
+        else:
+            t, solution = self.solve_model_lsoda(t_max, t_points)
+
         results = pd.DataFrame({
             'Day': t,
             'Susceptible': solution[:, 0],
@@ -66,61 +245,46 @@ class SIRModel:
         
         return results
     
-    def discrete_simulation(self, days=75):
+    def discrete_simulation(self, days=75, verbose=False):
         """
         Correct discrete time simulation with proper SIR equations
+
+        Set verbose=True to print the parameters and the first 10 days;
+        the default is quiet so sweeps and dashboards skip the I/O.
         """
-        # Initialize arrays
-        S = np.zeros(days + 1)
-        I = np.zeros(days + 1)  
-        R = np.zeros(days + 1)
-        
-        # Initial conditions
-        S[0], I[0], R[0] = self.S0, self.I0, self.R0
-        
-        print(f"🦠 CORRECT SIR MODEL SIMULATION")
-        print(f"Parameters: β={self.beta}, γ={self.gamma}, N={self.N}")
-        print(f"Initial: S={S[0]}, I={I[0]}, R={R[0]}")
-        print()
-        
-        # Discrete time evolution with CORRECT formulas
-        for t in range(days):
-            # Correct SIR equations
-            new_infections = self.beta * S[t] * I[t] / self.N
-            new_recoveries = self.gamma * I[t]
-            
-            # Update populations
-            S[t+1] = S[t] - new_infections
-            I[t+1] = I[t] + new_infections - new_recoveries
-            R[t+1] = R[t] + new_recoveries
-            
+        # Discrete time evolution with CORRECT formulas (compiled + cached).
+        # The kernel integrates in float64; output is stored at self.dtype
+        # (copy=False keeps the cached arrays when float64 is requested).
+        S, I, R = _simulate_cached(float(self.beta), float(self.gamma),
+                                   float(self.N), float(self.I0), days)
+        S = S.astype(self.dtype, copy=False)
+        I = I.astype(self.dtype, copy=False)
+        R = R.astype(self.dtype, copy=False)
+
+        if verbose:
+            print(f"🦠 CORRECT SIR MODEL SIMULATION")
+            print(f"Parameters: β={self.beta}, γ={self.gamma}, N={self.N}")
+            print(f"Initial: S={self.S0}, I={self.I0}, R={self.R0}")
+            print()
+
             # Show first 10 days for verification
-            if t < 10:
+            for t in range(min(10, days)):
                 print(f"Day {t:2d}→{t+1:2d}: S={S[t+1]:7.2f}, I={I[t+1]:7.2f}, R={R[t+1]:7.2f}")
-        
-        # Create results DataFrame
-        results = pd.DataFrame({
-            'Day': range(days + 1),
-            'Susceptible': S,
-            'Infected': I,
-            'Recovered': R,
-            'Total': S + I + R
-        })
-        
-        return results
-    
-    def get_peak_infection_day(self, results):
+
+        # Arrays only; callers wanting a DataFrame use to_dataframe()
+        return SimResult(np.arange(days + 1), S, I, R)
+
+    def get_peak_infection_day(self, sim):
         """Find day with maximum infections"""
-        peak_day = results.loc[results['Infected'].idxmax(), 'Day']
-        peak_infections = results['Infected'].max()
-        return int(peak_day), peak_infections
-    
-    def get_epidemic_summary(self, results):
+        peak_idx = sim.I.argmax()
+        return int(sim.day[peak_idx]), sim.I[peak_idx]
+
+    def get_epidemic_summary(self, sim):
         """
         Generate comprehensive summary statistics
         """
-        peak_day, peak_infections = self.get_peak_infection_day(results)
-        final_recovered = results['Recovered'].iloc[-1]
+        peak_day, peak_infections = self.get_peak_infection_day(sim)
+        final_recovered = sim.R[-1]
         recovery_rate = final_recovered / self.N
         
         # Basic reproduction number (R0)
@@ -156,10 +320,10 @@ if __name__ == "__main__":
     model = SIRModel(population=1000, initial_infected=1, beta=0.5, gamma=0.1)
     
     # Run discrete simulation
-    results = model.discrete_simulation(days=75)
-    
+    sim = model.discrete_simulation(days=75, verbose=True)
+
     # Print comprehensive summary
-    summary = model.get_epidemic_summary(results)
+    summary = model.get_epidemic_summary(sim)
     print("\n" + "="*60)
     print("📊 CORRECT SIR MODEL RESULTS")
     print("="*60)